@@ -1,10 +1,21 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import math
-import matplotlib.pyplot as plt
-# import seaborn as sns
-from utils.data_processing import load_csv, filter_data_multi
+from utils.data_processing import (
+    load_csv,
+    load_aggregates,
+    load_hierarchy,
+    count_records,
+    hierarchy_options,
+    compute_stats,
+    filter_positions,
+    scan_filter,
+    scan_stats,
+    USE_POLARS,
+    format_value,
+    Predict_Best_Tolerance_based_on_Material,
+    all_tolerance_scenarios,
+)
 
 # Set page configuration
 st.set_page_config(
@@ -14,6 +25,28 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+def filter_key(filters):
+    """Hashable key identifying a filter selection."""
+    return tuple((column, tuple(values)) for column, values in filters.items())
+
+def apply_filters(df, filters):
+    """Filter df, reusing the last row positions while the selection is unchanged."""
+    if not any(filters.values()):
+        return df
+    key = filter_key(filters)
+    cached = st.session_state.get("filter_cache")
+    if cached is None or cached[0] != key:
+        cached = (key, filter_positions(df, filters))
+        st.session_state.filter_cache = cached
+    return df.iloc[cached[1]]
+
+def keep_valid_selection(key, options):
+    """Drop selected values that a dependent multiselect no longer offers."""
+    selected = st.session_state.get(key, [])
+    kept = [value for value in selected if value in options]
+    if kept != selected:
+        st.session_state[key] = kept
+
 # Apply custom CSS for better styling
 def local_css():
     st.markdown("""
@@ -75,11 +108,11 @@ def main():
     # st.markdown("### Upload Your Data")
     # uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
     
-    # Load the CSV file
-    df = load_csv('./Data/Master.csv')
-    
-    # Initialize filtered dataframe
-    filtered_df = df.copy()
+    # Load the CSV file; the Polars path queries it lazily instead
+    df = None if USE_POLARS else load_csv('./Data/Master.csv')
+    total_records = count_records('./Data/Master.csv')
+    aggregates = load_aggregates('./Data/Master.csv')
+    hierarchy = load_hierarchy('./Data/Master.csv')
     
     # Initialize session state for the input value if it doesn't exist
     if 'input_value' not in st.session_state:
@@ -98,43 +131,51 @@ def main():
         # Create two columns for the filter buttons
         st.markdown("</div>", unsafe_allow_html=True)  # Close the background div
     
-    col1, col2, col3 = st.columns(3)
+    # Batch the filter selections so picking several values triggers a single rerun.
+    # Stable keys keep the dependent selections when their option lists change on Apply.
+    with st.form("filters"):
+        col1, col2, col3 = st.columns(3)
     
-    # Filters for Material Code
-    with col1:
-        st.write("Filter by Machine ID")
-        unique_mach_codes = df['MachineId'].unique().tolist()
-        selected_mach_codes = st.multiselect(
-            f"Select Machine Id values",
-            unique_mach_codes,
-            default=[]
-        )
-        filters["MachineId"] = selected_mach_codes
-        filtered_df = filter_data_multi(df, filters)
-
-    # Filters for Material Description
-    with col2:        
-        st.write("Filter by Material Description")
-        unique_mat_desc = filtered_df['MaterialDesc'].unique().tolist()
-        selected_mat_desc = st.multiselect(
-            f"Select Material Description values",
-            unique_mat_desc,
-            default=[]
-        )
-        filters["MaterialDesc"] = selected_mat_desc
-        filtered_df = filter_data_multi(df, filters)
+        # Filters for Material Code
+        with col1:
+            st.write("Filter by Machine ID")
+            unique_mach_codes = list(hierarchy)
+            selected_mach_codes = st.multiselect(
+                f"Select Machine Id values",
+                unique_mach_codes,
+                key="machine_filter"
+            )
+            filters["MachineId"] = selected_mach_codes
 
         # Filters for Material Description
-    with col3:        
-        st.write("Filter by Dimension Description")
-        unique_dim_desc = filtered_df['DimensionDesc'].unique().tolist()
-        selected_dim_desc = st.multiselect(
-            f"Select Dimension Description values",
-            unique_dim_desc,
-            default=[]
-        )
-        filters["DimensionDesc"] = selected_dim_desc
-        filtered_df = filter_data_multi(df, filters)
+        with col2:        
+            st.write("Filter by Material Description")
+            unique_mat_desc, _ = hierarchy_options(hierarchy, selected_mach_codes, [])
+            keep_valid_selection("material_filter", unique_mat_desc)
+            selected_mat_desc = st.multiselect(
+                f"Select Material Description values",
+                unique_mat_desc,
+                key="material_filter"
+            )
+            filters["MaterialDesc"] = selected_mat_desc
+
+            # Filters for Material Description
+        with col3:        
+            st.write("Filter by Dimension Description")
+            _, unique_dim_desc = hierarchy_options(hierarchy, selected_mach_codes, selected_mat_desc)
+            keep_valid_selection("dimension_filter", unique_dim_desc)
+            selected_dim_desc = st.multiselect(
+                f"Select Dimension Description values",
+                unique_dim_desc,
+                key="dimension_filter"
+            )
+            filters["DimensionDesc"] = selected_dim_desc
+            if USE_POLARS:
+                filtered_df = scan_filter('./Data/Master.csv', filters)
+            else:
+                filtered_df = apply_filters(df, filters)
+        
+        st.form_submit_button("Apply")
     
     # Display the filtered dataframe
     st.subheader("Data Table")
@@ -143,7 +184,7 @@ def main():
     # Show number of records after filtering with better styling
     st.markdown(f"""
     <div style="background-color: #EBF5FB; padding: 10px; border-radius: 5px; margin: 10px 0px;">
-        <span style="color: #2874A6; font-weight: 600;">📋 Showing {len(filtered_df)} of {len(df)} records</span>
+        <span style="color: #2874A6; font-weight: 600;">📋 Showing {len(filtered_df)} of {total_records} records</span>
     </div>
     """, unsafe_allow_html=True)
     
@@ -151,8 +192,19 @@ def main():
     st.subheader("Input Tolerance")
     
     # Create a single column for the input box
-    USL = filtered_df['USL'].unique()[0]
-    LSL = filtered_df['LSL'].unique()[0]
+    # Reuse the derived statistics while the filter selection is unchanged
+    key = filter_key(filters)
+    if st.session_state.get("derived_key") != key:
+        if USE_POLARS:
+            derived_stats = scan_stats('./Data/Master.csv', filters)
+        else:
+            derived_stats = compute_stats(filtered_df, aggregates, filters)
+        # Store the key only once the statistics exist, so a failure is retried
+        st.session_state.derived_stats = derived_stats
+        st.session_state.derived_key = key
+    stats = st.session_state.derived_stats
+    USL = stats["usl"]
+    LSL = stats["lsl"]
     Tolerance = (USL - LSL)
     value = st.number_input("Tolerance", value=Tolerance, step=0.01, format="%.4f", min_value=0.0)
 
@@ -163,30 +215,19 @@ def main():
         st.subheader("Actual Measurements")
         # Display standard deviation and other actual measurements
         if 'MeasValue' in filtered_df.columns:
-            std_dev = filtered_df['MeasValue'].std()
+            std_dev = stats["std"]
             
             # Get CP and CPK from filtered data if they exist
-            cp = filtered_df['Cp'].mean() if 'Cp' in filtered_df.columns else "N/A"
-            cpk = filtered_df['Cpk'].mean() if 'Cpk' in filtered_df.columns else "N/A"
+            cp = stats["cp"]
+            cpk = stats["cpk"]
             
-            # Create a styled container for actual measurements
-            st.markdown(f"""
-            <div style="background-color: #F8F9F9; padding: 15px; border-radius: 5px; border-left: 5px solid #2E86C1; margin: 10px 0px;">
-                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Std Dev: {std_dev:.4f}</p>
-                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Cp: {cp if isinstance(cp, str) else cp:.4f}</p>
-                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Cpk: {cpk if isinstance(cpk, str) else cpk:.4f}</p>
-                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Gage R&R: {filtered_df['Gage_RR'].unique()[0]:.2f}</p>
-                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Tolerance: {Tolerance:.2f}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.subheader("Suggested Measurements")
             # Calculate optimal tolerance
-            from utils.data_processing import Predict_Best_Tolerance_based_on_Material
-            optimal_result = Predict_Best_Tolerance_based_on_Material(filtered_df)
+            optimal_result = Predict_Best_Tolerance_based_on_Material(
+                stats["mean"], std_dev, LSL, USL, stats["gage_rr"]
+            )
             
             if optimal_result["success"]:
-                st.markdown(f"""
+                suggested_html = f"""
                 <div style="background-color: #E8F6F3; padding: 15px; border-radius: 5px; border-left: 5px solid #16A085; margin: 10px 0px;">
                     <h3 style="color: #16A085; margin-top: 0;">Recommended Optimal Tolerance:</h3>
                     <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Recommended Scenario: {optimal_result["recommended_scenario"]}</p>
@@ -198,25 +239,48 @@ def main():
                     <p style="font-size: 0.9rem; color: #566573;">• New LSL = {optimal_result["new_lsl"]:.4f}</p>
                     <p style="font-size: 0.9rem; color: #566573;">• New USL = {optimal_result["new_usl"]:.4f}</p>
                 </div>
-                """, unsafe_allow_html=True)
-                
+                """
+            else:
+                suggested_html = f"""
+                <div style="background-color: #FDEDEC; padding: 15px; border-radius: 5px; border-left: 5px solid #C0392B; margin: 10px 0px;">
+                    <h3 style="color: #C0392B; margin-top: 0;">Tolerance Optimization:</h3>
+                    <p style="font-size: 1.0rem; color: #2C3E50;">{optimal_result.get("message", "Could not calculate optimal tolerance.")}</p>
+                </div>
+                """
+            
+            # Render the actual and suggested measurement cards in a single element
+            st.markdown(f"""
+            <div style="background-color: #F8F9F9; padding: 15px; border-radius: 5px; border-left: 5px solid #2E86C1; margin: 10px 0px;">
+                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Std Dev: {std_dev:.4f}</p>
+                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Cp: {format_value(cp)}</p>
+                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Cpk: {format_value(cpk)}</p>
+                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Gage R&R: {stats['gage_rr']:.2f}</p>
+                <p style="font-size: 1.1rem; font-weight: 600; color: #2C3E50;">Tolerance: {Tolerance:.2f}</p>
+            </div>
+            <h3>Suggested Measurements</h3>
+            {suggested_html.strip()}
+            """, unsafe_allow_html=True)
+            
+            if optimal_result["success"]:
                 # Create an expandable section for all scenarios
                 with st.expander("View All Tolerance Scenarios"):
-                    # Create a table for all the scenarios
-                    scenario_data = []
-                    for idx, scenario in enumerate(optimal_result["all_scenarios"]):
-                        scenario_data.append({
-                            "Scenario": scenario["name"],
-                            "Tolerance": f"{scenario['tolerance']:.4f}",
-                            "Cp": f"{scenario['cp']:.2f}",
-                            "Cpk": f"{scenario['cpk']:.2f}",
-                            "Gage R&R (%)": f"{scenario['gage_rr']:.2f}",
-                            "LSL": f"{scenario['lsl']:.4f}",
-                            "USL": f"{scenario['usl']:.4f}"
-                        })
-                    
-                    # Display as a dataframe
-                    st.dataframe(scenario_data, use_container_width=True)
+                    # Create a table for all the scenarios, formatted on the frontend
+                    scenario_df = all_tolerance_scenarios(
+                        stats["mean"], std_dev, LSL, USL, stats["gage_rr"]
+                    )
+                    st.dataframe(
+                        scenario_df,
+                        use_container_width=True,
+                        hide_index=True,
+                        column_config={
+                            "Tolerance": st.column_config.NumberColumn(format="%.4f"),
+                            "Cp": st.column_config.NumberColumn(format="%.2f"),
+                            "Cpk": st.column_config.NumberColumn(format="%.2f"),
+                            "Gage R&R (%)": st.column_config.NumberColumn(format="%.2f"),
+                            "LSL": st.column_config.NumberColumn(format="%.4f"),
+                            "USL": st.column_config.NumberColumn(format="%.4f"),
+                        }
+                    )
                     
                     st.markdown("""
                     ### Scenario Details:
@@ -228,31 +292,21 @@ def main():
                     
                     The recommended scenario balances process capability (Cp/Cpk) with measurement system quality (Gage R&R).
                     """)
-            else:
-                st.markdown(f"""
-                <div style="background-color: #FDEDEC; padding: 15px; border-radius: 5px; border-left: 5px solid #C0392B; margin: 10px 0px;">
-                    <h3 style="color: #C0392B; margin-top: 0;">Tolerance Optimization:</h3>
-                    <p style="font-size: 1.0rem; color: #2C3E50;">{optimal_result.get("message", "Could not calculate optimal tolerance.")}</p>
-                </div>
-                """, unsafe_allow_html=True)
 
     with right_col:
         st.subheader("Forecast CP and Gage R&R")
         result_df = value / (6 * std_dev)
-        
-        st.markdown(f"""
-        <div style="background-color: #E8F8F5; padding: 9px; border-radius: 5px; border-left: 5px solid #1ABC9C; margin: 5px 0px;">
-            <h3 style="color: #16A085; margin-top: 0;">Forecasted CP:</h3>
-            <p style="font-size: 1.2rem; font-weight: 600; color: #2C3E50;">CP: {result_df:.4f}</p>
-        </div>
-        """, unsafe_allow_html=True)
-
 
         # Get the Gage R&R value from the filtered data
-        gage_rr_value = filtered_df['Gage_RR'].unique()[0]
+        gage_rr_value = stats["gage_rr"]
         Forecast_GRR = ((gage_rr_value * Tolerance) / value)
 
+        # Render both forecast cards in a single element
         st.markdown(f"""
+        <div style="background-color: #E8F8F5; padding: 9px; border-radius: 5px; border-left: 5px solid #1ABC9C; margin: 5px 0px;">
+            <h3 style="color: #16A085; margin-top: 0;">Forecasted CP:</h3>
+            <p style="font-size: 1.2rem; font-weight: 600; color: #2C3E50;">CP: {result_df:.4f}</p>
+        </div>
         <div style="background-color: #EDE7F6; padding: 9px; border-radius: 5px; border-left: 5px solid #7B1FA2; margin: 5px 0px;">
             <h3 style="color: #6A1B9A; margin-top: 0;">Forecasted Gage R&R:</h3>
             <p style="font-size: 1.2rem; font-weight: 600; color: #4A148C;">Forecast Gage R&R: {Forecast_GRR:.2f}</p>
@@ -1,21 +1,272 @@
+import os
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+try:
+    import polars as pl
+except ImportError:  # polars is optional; only needed for USE_POLARS
+    pl = None
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Columns used for filtering; stored as categoricals for fast isin/unique
+CATEGORY_COLUMNS = ['MachineId', 'MaterialDesc', 'DimensionDesc']
+# Measurements and limits stay float64, derived metrics only need float32
+FLOAT64_COLUMNS = ['MeasValue', 'LSL', 'USL']
+FLOAT32_COLUMNS = ['Cp', 'Cpk', 'Gage_RR']
+COLUMN_DTYPES = {
+    **{column: 'category' for column in CATEGORY_COLUMNS},
+    **{column: 'float64' for column in FLOAT64_COLUMNS},
+    **{column: 'float32' for column in FLOAT32_COLUMNS},
+}
+
+# Set USE_POLARS=1 to query large master files out of core with Polars
+USE_POLARS = pl is not None and os.environ.get('USE_POLARS') == '1'
+# Rows shown by the Polars path when no filter is selected
+PREVIEW_ROWS = 1000
+
+def _matches_schema(df):
+    """Check that df holds only used columns, with the dtypes in COLUMN_DTYPES."""
+    return all(
+        column in COLUMN_DTYPES and str(dtype) == COLUMN_DTYPES[column]
+        for column, dtype in df.dtypes.items()
+    )
+
+def _fresh_parquet(file):
+    """
+    Get the Parquet copy of a CSV file when it can be used instead of the CSV
+    
+    Args:
+        file: Path to the CSV file
+        
+    Returns:
+        str: Path of the Parquet copy, or None when it is missing, older than
+        the CSV, unreadable or written with a different schema
+    """
+    parquet_file = file + '.parquet'
+    try:
+        if os.path.getmtime(parquet_file) < os.path.getmtime(file):
+            return None
+        import pyarrow.parquet as pq
+        if not _matches_schema(pq.read_schema(parquet_file).empty_table().to_pandas()):
+            return None
+    except Exception:
+        return None
+    return parquet_file
+
+@st.cache_resource(show_spinner=False)
 def load_csv(file):
     """
-    Load a CSV file into a pandas DataFrame
+    Load a CSV file into a pandas DataFrame.
+    The DataFrame is cached as a shared resource, so reruns get it without
+    re-parsing or copying; callers must treat it as read-only. A Parquet copy
+    is reused across restarts while it is newer than the CSV and has the
+    expected schema; otherwise the CSV is parsed again.
     
     Args:
-        file: The uploaded file object
+        file: Path to the CSV file
         
     Returns:
         pandas.DataFrame: The loaded DataFrame
+        
+    Raises:
+        Exception: Read errors propagate, so Streamlit does not cache a failed load
     """
+    parquet_file = _fresh_parquet(file)
+    if parquet_file is not None:
+        try:
+            return pd.read_parquet(parquet_file, engine='pyarrow')
+        except Exception:
+            pass  # Damaged copy; rebuild it from the CSV below
+    
+    # Only the columns used by the app are loaded
+    header = pd.read_csv(file, nrows=0).columns
+    usecols = [column for column in header if column in COLUMN_DTYPES]
     try:
-        df = pd.read_csv(file)
-        return df
-    except Exception as e:
-        return pd.DataFrame({'Error': [f'Failed to load file: {str(e)}']})
+        # Arrow's multi-threaded parser is much faster on large files
+        df = pd.read_csv(file, engine='pyarrow', usecols=usecols, dtype=COLUMN_DTYPES)
+    except ImportError:
+        df = pd.read_csv(file, usecols=usecols, dtype=COLUMN_DTYPES)
+    
+    # Keep a Parquet copy next to the CSV so cold starts skip the CSV parser.
+    # It is written to a temporary file first so readers never see a partial copy.
+    tmp_file = f'{file}.parquet.{os.getpid()}.tmp'
+    try:
+        df.to_parquet(tmp_file, engine='pyarrow', compression='zstd')
+        os.replace(tmp_file, file + '.parquet')
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return df
+
+@st.cache_data(show_spinner=False)
+def load_aggregates(file):
+    """
+    Precompute measurement statistics for every filter group of a CSV file
+    
+    Args:
+        file: Path to the CSV file
+        
+    Returns:
+        pandas.DataFrame: Statistics indexed by (MachineId, MaterialDesc, DimensionDesc)
+    """
+    if USE_POLARS:
+        return _scan_aggregates(file)
+    
+    df = load_csv(file)
+    # Shift the values before summing squares to limit cancellation in fast_std
+    shift = df['MeasValue'].mean()
+    shifted = df['MeasValue'] - shift
+    df = df.assign(MeasValue_shifted=shifted, MeasValue_sq=shifted * shifted)
+    aggregations = {
+        'mean': ('MeasValue', 'mean'),
+        'n': ('MeasValue_shifted', 'count'),
+        's': ('MeasValue_shifted', 'sum'),
+        's2': ('MeasValue_sq', 'sum'),
+        'lsl': ('LSL', 'first'),
+        'usl': ('USL', 'first'),
+        'gage_rr': ('Gage_RR', 'first'),
+    }
+    if 'Cp' in df.columns:
+        aggregations['cp'] = ('Cp', 'mean')
+    if 'Cpk' in df.columns:
+        aggregations['cpk'] = ('Cpk', 'mean')
+    
+    return df.groupby(CATEGORY_COLUMNS, observed=True).agg(**aggregations)
+
+@st.cache_data(show_spinner=False)
+def count_records(file):
+    """
+    Count the rows of a CSV file
+    
+    Args:
+        file: Path to the CSV file
+        
+    Returns:
+        int: Number of records
+    """
+    if USE_POLARS:
+        return scan_master(file).select(pl.len()).collect().item()
+    return len(load_csv(file))
+
+@st.cache_data(show_spinner=False)
+def load_hierarchy(file):
+    """
+    Map every machine to its materials and every material to its dimensions
+    
+    Args:
+        file: Path to the CSV file
+        
+    Returns:
+        dict: {MachineId: {MaterialDesc: set of DimensionDesc}}
+    """
+    hierarchy = {}
+    for machine, material, dimension in load_aggregates(file).index:
+        hierarchy.setdefault(machine, {}).setdefault(material, set()).add(dimension)
+    return hierarchy
+
+def hierarchy_options(hierarchy, machines, materials):
+    """
+    Get the material and dimension options allowed by the selected machines and materials
+    
+    Args:
+        hierarchy: Dictionary returned by load_hierarchy
+        machines: Selected MachineId values, all machines when empty
+        materials: Selected MaterialDesc values, all materials when empty
+        
+    Returns:
+        tuple: Sorted lists of MaterialDesc and DimensionDesc options
+    """
+    material_options = set()
+    dimension_options = set()
+    for machine in machines or hierarchy:
+        for material, dimensions in hierarchy.get(machine, {}).items():
+            material_options.add(material)
+            if not materials or material in materials:
+                dimension_options.update(dimensions)
+    return sorted(material_options), sorted(dimension_options)
+
+def fast_std(n, s, s2):
+    """
+    Sample standard deviation (ddof=1) from a count, sum and sum of squares
+    
+    Args:
+        n: Number of values
+        s: Sum of the values
+        s2: Sum of the squared values
+        
+    Returns:
+        numpy.float64: Standard deviation, or NaN when fewer than two values
+    """
+    if n < 2:
+        return np.float64('nan')
+    return np.sqrt(np.float64(max(0.0, (s2 - s * s / n) / (n - 1))))
+
+def compute_stats(df, aggregates, filters_dict):
+    """
+    Get the measurement statistics for the current filter selection.
+    When exactly one value is selected for every group column the precomputed
+    aggregates are used, otherwise the statistics are computed from df.
+    
+    Args:
+        df: Filtered pandas.DataFrame
+        aggregates: DataFrame returned by load_aggregates
+        filters_dict: Dictionary where keys are column names and values are lists of selected values
+        
+    Returns:
+        dict: mean, std, lsl, usl, gage_rr, cp and cpk of the selection
+    """
+    key = tuple(
+        filters_dict[column][0]
+        for column in CATEGORY_COLUMNS
+        if len(filters_dict.get(column, [])) == 1
+    )
+    if len(key) == len(CATEGORY_COLUMNS) and key in aggregates.index:
+        row = aggregates.loc[key]
+        return {
+            "mean": row['mean'],
+            "std": fast_std(row['n'], row['s'], row['s2']),
+            "lsl": row['lsl'],
+            "usl": row['usl'],
+            "gage_rr": row['gage_rr'],
+            "cp": row.get('cp', "N/A"),
+            "cpk": row.get('cpk', "N/A"),
+        }
+    
+    # Limits and Gage R&R are constant within a group, so the first row is enough
+    has_rows = len(df) > 0
+    return {
+        "mean": df['MeasValue'].mean(),
+        "std": df['MeasValue'].std(),
+        "lsl": df['LSL'].iat[0] if has_rows else float('nan'),
+        "usl": df['USL'].iat[0] if has_rows else float('nan'),
+        "gage_rr": df['Gage_RR'].iat[0] if has_rows else float('nan'),
+        "cp": df['Cp'].mean() if 'Cp' in df.columns else "N/A",
+        "cpk": df['Cpk'].mean() if 'Cpk' in df.columns else "N/A",
+    }
+
+def format_value(value, spec='.4f'):
+    """
+    Format a number for display, passing non-numeric placeholders through
+    
+    Args:
+        value: Number or placeholder such as "N/A"
+        spec: Format spec applied to numbers
+        
+    Returns:
+        str: The formatted value
+    """
+    if isinstance(value, (int, float, np.number)):
+        return format(value, spec)
+    return str(value)
 
 def filter_data(df, column, selected_values):
     """
@@ -34,6 +285,25 @@ def filter_data(df, column, selected_values):
     
     return df[df[column].isin(selected_values)]
 
+def filter_positions(df, filters_dict):
+    """
+    Compute the row positions matching selected values in multiple columns
+    
+    Args:
+        df: pandas.DataFrame to filter
+        filters_dict: Dictionary where keys are column names and values are lists of selected values
+        
+    Returns:
+        numpy.ndarray: Integer positions of the matching rows
+    """
+    mask = np.ones(len(df), dtype=bool)
+    
+    for column, values in filters_dict.items():
+        if values:  # Only apply filter if values are selected
+            mask &= df[column].isin(values).to_numpy()
+    
+    return np.flatnonzero(mask)
+
 def filter_data_multi(df, filters_dict):
     """
     Filter DataFrame based on selected values in multiple columns
@@ -45,13 +315,126 @@ def filter_data_multi(df, filters_dict):
     Returns:
         pandas.DataFrame: Filtered DataFrame
     """
-    filtered_df = df.copy()
+    if not any(filters_dict.values()):
+        return df
+    
+    return df.iloc[filter_positions(df, filters_dict)]
+
+def scan_master(file):
+    """
+    Scan a CSV file lazily with Polars.
+    The Parquet copy written by load_csv is scanned when _fresh_parquet accepts it.
+    
+    Args:
+        file: Path to the CSV file
+        
+    Returns:
+        polars.LazyFrame: The used columns, with the filter columns as strings
+    """
+    parquet_file = _fresh_parquet(file)
+    if parquet_file is not None:
+        query = pl.scan_parquet(parquet_file)
+    else:
+        # Pin the dtypes like load_csv does; inferring them from the first rows
+        # reads columns with leading empty values as strings
+        polars_dtypes = {'category': pl.String, 'float64': pl.Float64, 'float32': pl.Float32}
+        query = pl.scan_csv(
+            file,
+            schema_overrides={column: polars_dtypes[dtype] for column, dtype in COLUMN_DTYPES.items()}
+        )
+    query = query.select([column for column in query.collect_schema().names() if column in COLUMN_DTYPES])
     
+    # Filter values come from the hierarchy keys, which are strings on this path
+    return query.with_columns(pl.col(CATEGORY_COLUMNS).cast(pl.String))
+
+def _scan_filtered(file, filters_dict):
+    query = scan_master(file)
     for column, values in filters_dict.items():
         if values:  # Only apply filter if values are selected
-            filtered_df = filtered_df[filtered_df[column].isin(values)]
+            query = query.filter(pl.col(column).is_in([str(value) for value in values]))
+    return query
+
+def _scan_aggregates(file):
+    """Polars counterpart of load_aggregates that never loads the whole file."""
+    query = scan_master(file).drop_nulls(CATEGORY_COLUMNS)
+    columns = query.collect_schema().names()
+    
+    query = query.with_columns(
+        MeasValue_shifted=pl.col('MeasValue') - pl.col('MeasValue').mean()
+    )
+    aggregations = [
+        pl.col('MeasValue').mean().alias('mean'),
+        pl.col('MeasValue_shifted').count().alias('n'),
+        pl.col('MeasValue_shifted').sum().alias('s'),
+        (pl.col('MeasValue_shifted') ** 2).sum().alias('s2'),
+        pl.col('LSL').drop_nulls().first().alias('lsl'),
+        pl.col('USL').drop_nulls().first().alias('usl'),
+        pl.col('Gage_RR').drop_nulls().first().alias('gage_rr'),
+    ]
+    if 'Cp' in columns:
+        aggregations.append(pl.col('Cp').mean().alias('cp'))
+    if 'Cpk' in columns:
+        aggregations.append(pl.col('Cpk').mean().alias('cpk'))
+    
+    aggregates = query.group_by(CATEGORY_COLUMNS).agg(aggregations).sort(CATEGORY_COLUMNS).collect()
+    return aggregates.to_pandas().set_index(CATEGORY_COLUMNS)
+
+# Bound the cached selections so filtered frames don't pile up across sessions
+@st.cache_data(show_spinner=False, max_entries=8, ttl=3600)
+def scan_filter(file, filters_dict):
+    """
+    Filter a CSV file lazily with Polars, pushing the filters down to the scan.
+    Without any selected values only the first PREVIEW_ROWS rows are returned.
+    
+    Args:
+        file: Path to the CSV file
+        filters_dict: Dictionary where keys are column names and values are lists of selected values
+        
+    Returns:
+        pandas.DataFrame: Filtered DataFrame
+    """
+    if not any(filters_dict.values()):
+        query = scan_master(file).head(PREVIEW_ROWS)
+    else:
+        query = _scan_filtered(file, filters_dict)
+    
+    # Convert only the matching rows for Streamlit
+    df = query.collect().to_pandas()
+    for column in CATEGORY_COLUMNS:
+        df[column] = df[column].astype('category')
+    return df
+
+@st.cache_data(show_spinner=False)
+def scan_stats(file, filters_dict):
+    """
+    Polars counterpart of compute_stats, aggregating the selection lazily
+    
+    Args:
+        file: Path to the CSV file
+        filters_dict: Dictionary where keys are column names and values are lists of selected values
+        
+    Returns:
+        dict: mean, std, lsl, usl, gage_rr, cp and cpk of the selection
+    """
+    query = _scan_filtered(file, filters_dict)
+    columns = query.collect_schema().names()
+    aggregations = [
+        pl.col('MeasValue').mean().alias('mean'),
+        pl.col('MeasValue').std().alias('std'),
+        pl.col('LSL').first().alias('lsl'),
+        pl.col('USL').first().alias('usl'),
+        pl.col('Gage_RR').first().alias('gage_rr'),
+    ]
+    if 'Cp' in columns:
+        aggregations.append(pl.col('Cp').mean().alias('cp'))
+    if 'Cpk' in columns:
+        aggregations.append(pl.col('Cpk').mean().alias('cpk'))
     
-    return filtered_df
+    row = query.select(aggregations).collect().row(0, named=True)
+    stats = {name: np.float64('nan' if value is None else value) for name, value in row.items()}
+    stats.setdefault('cp', "N/A")
+    stats.setdefault('cpk', "N/A")
+    return stats
 
 def filter_text_search(df, column, search_terms):
     """
@@ -82,19 +465,63 @@ def filter_text_search(df, column, search_terms):
     
     return filtered_df[mask]
 
-def Predict_Best_Tolerance_based_on_Material(df):
+SCENARIO_NAMES = [
+    "Minimum Acceptable Tolerance (Cp = 1.0)",
+    "Good Quality Tolerance (Cp = 1.33)",
+    "High Quality Tolerance (Cp = 1.67)",
+    "Excellent Measurement System (Gage R&R = 10%)",
+]
+
+# Recommend the good quality scenario instead of the highest scoring one
+GOOD_QUALITY_SCENARIO = 1
+PIN_TO_GOOD_QUALITY = True
+
+@njit(cache=True, error_model='numpy')
+def _tolerance_scenarios(std_dev, mean, lsl, usl, current_gage_rr):
+    """
+    Compute the tolerance scenarios listed in SCENARIO_NAMES.
+    Division by a zero std_dev yields inf, matching the NumPy float semantics.
+    
+    Returns:
+        tuple: Arrays of tolerance, cp, cpk, gage_rr, lsl and usl with one entry per scenario
+    """
+    current_tolerance = usl - lsl
+    
+    # Scenarios 1-3 target Cp = 1.0, 1.33 and 1.67; scenario 4 targets Gage R&R = 10%
+    excellent_gage_tolerance = (current_gage_rr * current_tolerance) / 10
+    cps = np.array([1.0, 1.33, 1.67, excellent_gage_tolerance / (6 * std_dev)])
+    
+    tolerances = 6 * std_dev * cps
+    tolerances[3] = excellent_gage_tolerance
+    gage_rrs = (current_gage_rr * current_tolerance) / tolerances
+    gage_rrs[3] = 10.0
+    
+    # Cpk equals Cp assuming a centered process
+    return tolerances, cps, cps.copy(), gage_rrs, mean - tolerances / 2, mean + tolerances / 2
+
+# Compile the kernel at import so the first rerun doesn't pay for it
+_tolerance_scenarios(np.float64(1.0), np.float64(0.0), np.float64(-1.0), np.float64(1.0), np.float64(10.0))
+
+@st.cache_data(show_spinner=False)
+def Predict_Best_Tolerance_based_on_Material(mean, std_dev, lsl, usl, current_gage_rr):
     """
     Find the optimal balance between tolerance, Cp, Cpk, and Gage R&R.
     Instead of targeting specific values, this calculates the best possible
     metrics that could be achieved given the current process capability.
+    The result is cached on the scalar inputs, so reruns that leave the
+    filters unchanged reuse it.
     
     Args:
-        df: DataFrame containing measurement data with Gage_RR, MeasValue, LSL, and USL columns
+        mean: Mean of the measured values
+        std_dev: Standard deviation of the measured values
+        lsl: Current lower specification limit
+        usl: Current upper specification limit
+        current_gage_rr: Current Gage R&R value
     
     Returns:
-        dict: Contains optimal tolerance values and resulting metrics for different scenarios
+        dict: Contains the recommended tolerance and its resulting metrics
     """
-    if len(df) == 0:
+    if pd.isna(std_dev):
         return {
             "best_tolerance": None,
             "message": "No data available for prediction",
@@ -102,18 +529,8 @@ def Predict_Best_Tolerance_based_on_Material(df):
         }
     
     try:
-        # Get required values from the dataframe
-        std_dev = df['MeasValue'].std()
-        mean = df['MeasValue'].mean()
-        
-        # Get current specifications
-        lsl = df['LSL'].unique()[0]
-        usl = df['USL'].unique()[0]
         current_tolerance = usl - lsl
         
-        # Get the current Gage R&R value
-        current_gage_rr = df['Gage_RR'].unique()[0]
-        
         # Calculate current process metrics
         current_cp = current_tolerance / (6 * std_dev) if std_dev > 0 else float('inf')
         current_cpk_lower = (mean - lsl) / (3 * std_dev) if std_dev > 0 else float('inf')
@@ -121,90 +538,27 @@ def Predict_Best_Tolerance_based_on_Material(df):
         current_cpk = min(current_cpk_lower, current_cpk_upper)
         
         # Calculate best possible metrics for different scenarios
-        scenarios = []
-        
-        # Scenario 1: Optimize for Cp/Cpk = 1.0 (minimum acceptable)
-        min_acceptable_tolerance = 6 * std_dev
-        gage_rr_at_min = (current_gage_rr * current_tolerance) / min_acceptable_tolerance
-        
-        scenarios.append({
-            "name": "Minimum Acceptable Tolerance (Cp = 1.0)",
-            "tolerance": min_acceptable_tolerance,
-            "cp": 1.0,
-            "cpk": 1.0,  # Assuming centered process
-            "gage_rr": gage_rr_at_min,
-            "lsl": mean - (min_acceptable_tolerance / 2),
-            "usl": mean + (min_acceptable_tolerance / 2)
-        })
-        
-        # Scenario 2: Optimize for Cp/Cpk = 1.33 (good quality)
-        good_tolerance = 6 * std_dev * 1.33
-        gage_rr_at_good = (current_gage_rr * current_tolerance) / good_tolerance
-        
-        scenarios.append({
-            "name": "Good Quality Tolerance (Cp = 1.33)",
-            "tolerance": good_tolerance,
-            "cp": 1.33,
-            "cpk": 1.33,  # Assuming centered process
-            "gage_rr": gage_rr_at_good,
-            "lsl": mean - (good_tolerance / 2),
-            "usl": mean + (good_tolerance / 2)
-        })
-        
-        # Scenario 3: Optimize for Cp/Cpk = 1.67 (high quality)
-        high_tolerance = 6 * std_dev * 1.67
-        gage_rr_at_high = (current_gage_rr * current_tolerance) / high_tolerance
-        
-        scenarios.append({
-            "name": "High Quality Tolerance (Cp = 1.67)",
-            "tolerance": high_tolerance,
-            "cp": 1.67,
-            "cpk": 1.67,  # Assuming centered process
-            "gage_rr": gage_rr_at_high,
-            "lsl": mean - (high_tolerance / 2),
-            "usl": mean + (high_tolerance / 2)
-        })
-        
-        # Scenario 4: Optimize for Gage R&R = 10% (excellent measurement system)
-        excellent_gage_tolerance = (current_gage_rr * current_tolerance) / 10
-        cp_at_excellent = excellent_gage_tolerance / (6 * std_dev)
-        
-        scenarios.append({
-            "name": "Excellent Measurement System (Gage R&R = 10%)",
-            "tolerance": excellent_gage_tolerance,
-            "cp": cp_at_excellent,
-            "cpk": cp_at_excellent,  # Assuming centered process
-            "gage_rr": 10.0,
-            "lsl": mean - (excellent_gage_tolerance / 2),
-            "usl": mean + (excellent_gage_tolerance / 2)
-        })
-        
-        # Find the best balanced scenario - this is subjective and depends on priorities
-        # Let's use a scoring approach combining Cp and Gage R&R
-        for scenario in scenarios:
-            # Higher score is better - we want high Cp and low Gage R&R
-            # Score = Cp - (Gage R&R / 100)
-            scenario["score"] = scenario["cp"] - (scenario["gage_rr"] / 100)
-        
-        # Sort scenarios by score (descending)
-        # scenarios.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Get the best scenario (highest score)
-        best_scenario = scenarios[1]
+        tolerances, cps, cpks, gage_rrs, lsls, usls = _tolerance_scenarios(
+            np.float64(std_dev), np.float64(mean), np.float64(lsl), np.float64(usl), np.float64(current_gage_rr)
+        )
+        
+        # Find the best balanced scenario - this is subjective and depends on priorities.
+        # Higher score is better - we want high Cp and low Gage R&R
+        scores = cps - (gage_rrs / 100)
+        best = GOOD_QUALITY_SCENARIO if PIN_TO_GOOD_QUALITY else int(np.argmax(scores))
         
         # Prepare the final recommendation
         return {
-            "best_tolerance": best_scenario["tolerance"],
-            "new_lsl": best_scenario["lsl"],
-            "new_usl": best_scenario["usl"],
-            "resulting_cp": best_scenario["cp"],
-            "resulting_cpk": best_scenario["cpk"],
-            "resulting_gage_rr": best_scenario["gage_rr"],
+            "best_tolerance": float(tolerances[best]),
+            "new_lsl": float(lsls[best]),
+            "new_usl": float(usls[best]),
+            "resulting_cp": float(cps[best]),
+            "resulting_cpk": float(cpks[best]),
+            "resulting_gage_rr": float(gage_rrs[best]),
             "current_cp": current_cp,
             "current_cpk": current_cpk,
             "current_gage_rr": current_gage_rr,
-            "all_scenarios": scenarios,
-            "recommended_scenario": best_scenario["name"],
+            "recommended_scenario": SCENARIO_NAMES[best],
             "success": True
         }
     
@@ -214,3 +568,31 @@ def Predict_Best_Tolerance_based_on_Material(df):
             "message": f"Error in prediction: {str(e)}",
             "success": False
         }
+
+@st.cache_data(show_spinner=False)
+def all_tolerance_scenarios(mean, std_dev, lsl, usl, current_gage_rr):
+    """
+    Tabulate every tolerance scenario considered by Predict_Best_Tolerance_based_on_Material
+    
+    Args:
+        mean: Mean of the measured values
+        std_dev: Standard deviation of the measured values
+        lsl: Current lower specification limit
+        usl: Current upper specification limit
+        current_gage_rr: Current Gage R&R value
+    
+    Returns:
+        pandas.DataFrame: One row per scenario with its tolerance, metrics and limits
+    """
+    tolerances, cps, cpks, gage_rrs, lsls, usls = _tolerance_scenarios(
+        np.float64(std_dev), np.float64(mean), np.float64(lsl), np.float64(usl), np.float64(current_gage_rr)
+    )
+    return pd.DataFrame({
+        "Scenario": SCENARIO_NAMES,
+        "Tolerance": tolerances,
+        "Cp": cps,
+        "Cpk": cpks,
+        "Gage R&R (%)": gage_rrs,
+        "LSL": lsls,
+        "USL": usls,
+    })